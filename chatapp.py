@@ -1,18 +1,32 @@
 import os
+import hashlib
+import hmac
+import queue
+import secrets
+import threading
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 import jwt
 from datetime import datetime, timedelta, timezone
 import smtplib
 from email.message import EmailMessage
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
+from cachetools import TTLCache
+import orjson
 
 # Load environment variables
 load_dotenv()
 
+class OrjsonProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # --- CORS ---
 CORS(app, supports_credentials=True)
@@ -23,29 +37,63 @@ if not SECRET_KEY:
     raise ValueError("SECRET_KEY environment variable is required")
 
 # --- In-memory store (instead of database) ---
-user_store = {}
+# Entries expire 5 minutes after the OTP is issued
+user_store = TTLCache(maxsize=100_000, ttl=300)
+user_store_lock = threading.Lock()
 
 # --- Quantum OTP Generation ---
 def generate_quantum_otp(length=6):
-    num_bits = length * 4
-    circuit = QuantumCircuit(num_bits, num_bits)
-    circuit.h(range(num_bits))
-    circuit.measure(range(num_bits), range(num_bits))
-    
-    simulator = AerSimulator()
-    compiled_circuit = transpile(circuit, simulator)
-    job = simulator.run(compiled_circuit, shots=1)
-    result = job.result()
-    counts = result.get_counts(circuit)
-    
-    random_bitstring = list(counts.keys())[0]
-    random_integer = int(random_bitstring, 2)
-    otp_integer = random_integer % (10**length)
-    otp_string = format(otp_integer, f'0{length}d')
-    
-    return otp_string
+    # Measuring H^n|0> yields uniformly random bits, so sampling it on a
+    # simulator is equivalent to drawing from the OS CSPRNG directly.
+    return f"{secrets.randbelow(10**length):0{length}d}"
+
+def hash_otp(otp):
+    # Keyed so the 10**6 code space can't be brute-forced from the digest
+    return hmac.new(SECRET_KEY.encode(), otp.encode(), hashlib.sha256).hexdigest()
 
 # --- Email Sending Functionality ---
+# Authenticated connections are reused to skip the TLS handshake and login
+_SMTP_POOL = queue.Queue(maxsize=4)
+# Bounds noop/send on pooled connections silently dropped by NAT
+SMTP_TIMEOUT = 10
+
+def _close_smtp(smtp):
+    try:
+        smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp.close()
+
+def _connect_smtp(sender_email, app_password):
+    smtp = smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=SMTP_TIMEOUT)
+    try:
+        smtp.login(sender_email, app_password)
+    except Exception:
+        smtp.close()
+        raise
+    return smtp
+
+def get_smtp(sender_email, app_password):
+    """Returns (smtp, fresh); fresh is False for a reused pooled connection."""
+    try:
+        smtp = _SMTP_POOL.get_nowait()
+    except queue.Empty:
+        return _connect_smtp(sender_email, app_password), True
+
+    # Probe a single pooled connection so a stale pool can't stack timeouts
+    try:
+        if smtp.noop()[0] == 250:
+            return smtp, False
+    except (smtplib.SMTPException, OSError):
+        pass
+    smtp.close()
+    return _connect_smtp(sender_email, app_password), True
+
+def release_smtp(smtp):
+    try:
+        _SMTP_POOL.put_nowait(smtp)
+    except queue.Full:
+        _close_smtp(smtp)
+
 def send_otp_by_email(otp_code, recipient_email):
     sender_email = os.environ.get('EMAIL_ADDRESS')
     app_password = os.environ.get('EMAIL_PASSWORD')
@@ -60,9 +108,23 @@ def send_otp_by_email(otp_code, recipient_email):
     msg.set_content(f"Your secure One-Time Password is: {otp_code}\n\nThis OTP will expire shortly.")
 
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(sender_email, app_password)
-            smtp.send_message(msg)
+        smtp, fresh = get_smtp(sender_email, app_password)
+        try:
+            try:
+                smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                if fresh:
+                    raise
+                # A pooled connection can die even after passing NOOP, so retry
+                # once on a fresh one. If the server dropped it after accepting
+                # DATA, the OTP email is delivered twice.
+                smtp.close()
+                smtp = _connect_smtp(sender_email, app_password)
+                smtp.send_message(msg)
+        except Exception:
+            smtp.close()
+            raise
+        release_smtp(smtp)
         return True
     except Exception as e:
         print(f"Email sending failed: {e}")
@@ -77,11 +139,12 @@ def request_otp():
         return jsonify({"error": "Email is required"}), 400
 
     otp = generate_quantum_otp(6)
-    otp_expiration = datetime.now(timezone.utc) + timedelta(minutes=5)
-    user_store[email] = {"otp": otp, "otp_expiration": otp_expiration}
+    with user_store_lock:
+        user_store[email] = {"otp_hash": hash_otp(otp)}
 
     try:
-        send_otp_by_email(otp, email)
+        if not send_otp_by_email(otp, email):
+            return jsonify({"error": "Failed to send OTP email."}), 500
         return jsonify({"message": f"OTP sent to {email}."}), 200
     except Exception as e:
         return jsonify({"error": "Failed to send OTP email."}), 500
@@ -95,23 +158,27 @@ def verify_otp():
     if not email or not submitted_otp:
         return jsonify({"error": "Email and OTP are required"}), 400
 
-    user_data = user_store.get(email)
-    if not user_data:
-        return jsonify({"error": "No OTP found for this email"}), 404
-
-    if user_data["otp"] != submitted_otp:
+    if not isinstance(submitted_otp, str):
         return jsonify({"error": "Invalid OTP."}), 400
 
-    if datetime.now(timezone.utc) > user_data["otp_expiration"]:
-        return jsonify({"error": "OTP has expired."}), 400
+    submitted_hash = hash_otp(submitted_otp)
+
+    # Look up, compare and consume in one step so each OTP verifies only once
+    with user_store_lock:
+        user_data = user_store.get(email)
+        if not user_data:
+            return jsonify({"error": "No OTP found for this email"}), 404
+
+        if not hmac.compare_digest(user_data["otp_hash"], submitted_hash):
+            return jsonify({"error": "Invalid OTP."}), 400
+
+        del user_store[email]
 
     token = jwt.encode({
         'email': email,
         'exp': datetime.now(timezone.utc) + timedelta(hours=24)
     }, SECRET_KEY, algorithm="HS256")
 
-    user_store[email] = {"otp": None, "otp_expiration": None}
-
     return jsonify({"message": "Verification successful!", "token": token}), 200
 
 @app.route('/api/profile', methods=['GET'])
@@ -0,0 +1,14 @@
+import os
+
+# Production entrypoint: gunicorn -c gunicorn_conf.py chatapp:app
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Import the app in the master so import errors fail at startup
+preload_app = True
+
+# user_store lives in process memory, so a single worker is required for
+# /api/verify-otp to see OTPs issued by /api/request-otp; scale with threads.
+# Deliberately not read from WEB_CONCURRENCY, which Heroku sets on its own.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
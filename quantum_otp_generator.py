@@ -1,47 +1,22 @@
 import os
 import smtplib
 from email.message import EmailMessage
-import random
-import time
-import math
+import secrets
 
 # --- Simple Quantum-Inspired OTP Generation ---
 def generate_quantum_otp(length=6):
     """
-    Generates a quantum-inspired OTP using high-quality randomness.
-    Returns a numeric OTP of specified length.
+    Generates a numeric OTP of specified length.
+    Draws one uniform integer from OS entropy, so every digit is unbiased.
     """
-    # Use multiple entropy sources for true randomness
-    seed = int(time.time() * 1000) + int.from_bytes(os.urandom(4), 'big')
-    random.seed(seed)
-    
-    # Generate OTP using quantum-inspired probability
-    otp = ""
-    for _ in range(length):
-        # Simulate quantum probability (Born rule)
-        angle = random.uniform(0, 2 * math.pi)
-        prob = (math.sin(angle) ** 2)  # Quantum probability formula
-        
-        # Generate digit with quantum-inspired randomness
-        digit = int(random.random() * 10 * prob) % 10
-        otp += str(digit)
-    
-    return otp
+    return f"{secrets.randbelow(10**length):0{length}d}"
 
 # --- Alternative: Even simpler version ---
 def generate_simple_quantum_otp(length=6):
     """
-    Simple quantum-inspired OTP using system entropy.
+    Alias of generate_quantum_otp, kept for existing callers.
     """
-    # Use high-quality system entropy
-    random.seed(int(time.time() * 1000) + int.from_bytes(os.urandom(4), 'big'))
-    
-    # Generate cryptographically strong OTP
-    otp = ""
-    for _ in range(length):
-        otp += str(random.randint(0, 9))
-    
-    return otp
+    return generate_quantum_otp(length)
 
 # --- Email Sending Functionality ---
 def send_otp_by_email(otp_code, recipient_email):